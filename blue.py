@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 from multiprocessing import Process, Queue
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from sqlalchemy import create_engine
 from functools import wraps
 import subprocess
+import threading
 import argparse
 import pandas as pd
 import luigi
+import queue
 import time
 import sys
 import os
@@ -46,9 +49,84 @@ def processify(func):
         return ret
     return wrapper
 
+# Rows read between two updates of the DB_TASK metrics
+DB_CHUNKSIZE = 10000
+
+
+def read_query(db_query, engine, task_name, results, results_type):
+    '''
+    Read the results of a query in chunks and write each chunk to the results file as it arrives,
+    so that the whole result is never held in memory and the metrics follow the rows
+    '''
+    push_metric('db_query_start', task_name, time.time())
+    rows    = 0
+    first   = True
+    sink    = None
+    writer  = None
+    schema  = None
+    # xlsx cannot be appended to, and a parquet or arrow file needs the type of every column
+    # before its first chunk, so those chunks are held here until they can be written
+    pending = []
+
+    def write(chunk, last=False):
+        nonlocal sink, writer, schema
+        if results_type == "csv":
+            if chunk is not None:
+                chunk.to_csv(results,mode='w' if first else 'a',encoding = 'utf-8',index=False,header=first,quoting=2)
+        elif results_type == "xlsx":
+            if chunk is not None:
+                pending.append(chunk)
+            if last:
+                pd.concat(pending, ignore_index=True).to_excel(results,index=False,header=True)
+        elif writer is not None:
+            if chunk is not None:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        else:
+            if chunk is not None:
+                pending.append(pa.Table.from_pandas(chunk, preserve_index=False))
+            schema = pa.unify_schemas([table.schema for table in pending])
+            # A column holding only NULLs so far has no type yet
+            if not last and any(pa.types.is_null(field.type) for field in schema):
+                return
+            if results_type == "parquet":
+                writer = pq.ParquetWriter(results, schema)
+            else:
+                # Uncompressed so that a TRANSFORM_TASK can memory map it without decoding
+                sink   = pa.OSFile(results, 'wb')
+                writer = pa.ipc.new_file(sink, schema)
+            for table in pending:
+                writer.write_table(table.cast(schema))
+            pending.clear()
+
+    if results_type in ("parquet", "arrow"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    try:
+        try:
+            # stream_results keeps the driver from buffering the whole result before the first chunk
+            with engine.connect().execution_options(stream_results=True) as connection:
+                for chunk in pd.read_sql_query(db_query, connection, chunksize=DB_CHUNKSIZE):
+                    write(chunk)
+                    first = False
+                    rows  = rows + len(chunk)
+                    push_metric('db_rows', task_name, rows)
+            write(pd.DataFrame() if first else None, last=True)
+        finally:
+            if writer is not None:
+                writer.close()
+            if sink is not None:
+                sink.close()
+    except Exception:
+        # A partial results file would mark the task as complete on the next build
+        if os.path.exists(results):
+            os.remove(results)
+        raise
+    push_metric('db_query_end', task_name, time.time())
+    return rows
+
 @processify
-def q(db_query,engine):
-    return pd.read_sql_query(db_query,engine)
+def q(db_query,engine,task_name,results,results_type):
+    return read_query(db_query,engine,task_name,results,results_type)
 
 def execQuery(db_options,db_query,proxy_options,use_proxy=False):
     '''
@@ -61,6 +139,8 @@ def execQuery(db_options,db_query,proxy_options,use_proxy=False):
     db_name      = db_options['db_name']
     db_port      = int(db_options['db_port'])
     TASK_NAME    = db_options['task_name']
+    RESULTS      = db_options['results']
+    RESULTS_TYPE = db_options['results_type']
     if use_proxy == 'True':
             sys.stdout.write('INFO - Connect to Proxy: "%s".\n' %(proxy_options['ssh_proxy']))
             ssh_username = proxy_options['ssh_username']
@@ -72,6 +152,7 @@ def execQuery(db_options,db_query,proxy_options,use_proxy=False):
                 from sshtunnel import SSHTunnelForwarder
                 tunnel = SSHTunnelForwarder((ssh_proxy, ssh_port),ssh_username = ssh_username,ssh_password = ssh_password,remote_bind_address=(db_hostname, db_port),threaded = True )
                 tunnel.start()
+                push_metric('ssh_tunnels', os.getpid(), 1)
             except Exception as ex:
                 sys.stderr.write('ERROR - Task "%s" Could not create SSH tunnel: "%s" - %s.\n'%(TASK_NAME,str(ex)))
                 sys.exit()
@@ -82,19 +163,20 @@ def execQuery(db_options,db_query,proxy_options,use_proxy=False):
             # Execute query, stop ssh tunnel and return results
             try:
                 sys.stdout.write('INFO - Executing task: "%s" .\n'%(TASK_NAME))
-                results = q(db_query=db_query,engine=engine)
+                rows = q(db_query=db_query,engine=engine,task_name=TASK_NAME.replace('()',''),results=RESULTS,results_type=RESULTS_TYPE)
             except Exception as ex:
                 sys.stderr.write('ERROR - Could not execute task: "%s" - %s.\n'%(TASK_NAME,str(ex)))
                 sys.exit()
             tunnel.stop()
-            return results
+            push_metric('ssh_tunnels', os.getpid(), -1)
+            return rows
     else:
         # Create connection string and engine, execute query and return results
         conn_string = '%s://%s:%s@%s:%s/%s'%(db_engine,db_username,db_password,db_hostname,db_port,db_name)
         engine      = create_engine(conn_string)
         try:
             sys.stdout.write('INFO - Executing task: "%s" .\n'%(TASK_NAME))
-            return pd.read_sql_query(db_query,engine)
+            return read_query(db_query,engine,TASK_NAME.replace('()',''),RESULTS,RESULTS_TYPE)
         except Exception as ex:
             sys.stderr.write('ERROR - Could not execute task: "%s" - %s.\n'%(TASK_NAME,str(ex)))
             sys.exit()
@@ -188,6 +270,491 @@ def section_mgr(blueprint_configuration, section, section_param, verify, action)
     return blueprint_configuration
 
 
+class BuildMetrics(object):
+    '''
+    Live metrics of a running build, exported as a Prometheus textfile and/or a local HTTP endpoint.
+    Tasks may run in forked worker processes, so they only push events to a queue,
+    the main process counts them.
+    '''
+    # Weight of the previous CPU of a task type against a new sample
+    CPU_DECAY = 0.8
+
+    def __init__(self, metrics_file, metrics_port, metrics_interval):
+        self.metrics_file     = metrics_file
+        self.metrics_port     = metrics_port
+        self.metrics_interval = metrics_interval
+        self.events           = Queue()
+        self.lock             = threading.Lock()
+        self.stopped          = threading.Event()
+        self.started          = time.time()
+        self.scheduled        = {}
+        self.running          = {}
+        self.done             = {}
+        self.failed           = {}
+        self.finished         = set()
+        self.processes        = {}
+        self.worker_cpu       = {}
+        self.worker_memory    = {}
+        self.ssh_sessions     = {}
+        self.ssh_tunnels      = {}
+        self.db_queries       = {}
+        self.db_rows          = {}
+        self.db_rows_per_sec  = {}
+        self.bytes_written    = {}
+        self.type_memory      = {}
+        self.type_cpu         = {}
+        self.worker_limits    = {}
+        self.sampled_by_controller = False
+        self.http_server      = None
+        self.exporter         = None
+
+    def start(self, tasks):
+        '''
+        Count the tasks that will run and start exporting
+        '''
+        # Luigi does not look at the requirements of a complete task
+        seen  = set()
+        stack = list(tasks)
+        while stack:
+            task = stack.pop()
+            if task.task_id in seen:
+                continue
+            seen.add(task.task_id)
+            if task.complete():
+                continue
+            TASK_TYPE = task_type(task)
+            self.scheduled[TASK_TYPE] = self.scheduled.get(TASK_TYPE, 0) + 1
+            stack.extend(luigi.task.flatten(task.requires()))
+
+        try:
+            import psutil
+        except Exception as ex:
+            sys.stdout.write('WARN - psutil is not installed, worker CPU and memory will not be observed.\n')
+
+        if self.metrics_port:
+            metrics = self
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+
+                def do_GET(self):
+                    body = metrics.render().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            try:
+                self.http_server = ThreadingHTTPServer(('127.0.0.1', self.metrics_port), MetricsHandler)
+            except Exception as ex:
+                sys.stderr.write('ERROR - BUILD, METRICS_PORT: "%s" Cannot be used - %s.\n' % (self.metrics_port, str(ex)))
+                sys.exit(-1)
+            threading.Thread(target=self.http_server.serve_forever, daemon=True).start()
+            sys.stdout.write('INFO - Metrics at: "http://127.0.0.1:%s/metrics".\n' % (self.metrics_port))
+
+        self.exporter = threading.Thread(target=self.export, daemon=True)
+        self.exporter.start()
+
+    def stop(self):
+        '''
+        Stop exporting, the textfile is left with the final state of the build
+        '''
+        self.stopped.set()
+        self.exporter.join()
+        with self.lock:
+            self.collect()
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+
+    def export(self):
+        while True:
+            stopping = self.stopped.wait(self.metrics_interval)
+            # Drain the queue even if nobody reads the metrics, a full queue blocks the tasks.
+            # WORKERS auto samples the workers on its own interval, otherwise they are sampled here.
+            if self.sampled_by_controller:
+                with self.lock:
+                    self.collect()
+            else:
+                self.sample()
+            if self.metrics_file:
+                self.write(self.metrics_file)
+            if stopping:
+                return
+
+    def write(self, path):
+        # Write and rename, so that a textfile collector never reads half a file
+        try:
+            with open(path + '.tmp', 'w') as metrics_file:
+                metrics_file.write(self.render())
+            os.replace(path + '.tmp', path)
+        except Exception as ex:
+            sys.stderr.write('ERROR - BUILD, METRICS_FILE: "%s" Cannot be written - %s.\n' % (path, str(ex)))
+
+    def collect(self):
+        '''
+        Count the events pushed by the tasks
+        '''
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == 'task_start':
+                TASK_ID, TASK_TYPE, pid = event[1], event[2], event[3]
+                self.running[TASK_ID] = (TASK_TYPE, pid)
+                self.finished.discard(TASK_ID)
+            if event[0] in ['task_done', 'task_failed']:
+                TASK_ID, TASK_TYPE, TASK_NAME = event[1], event[2], event[3]
+                # A failure can be reported by the task process and by the worker, count it once
+                if TASK_ID in self.finished:
+                    continue
+                self.finished.add(TASK_ID)
+                if TASK_ID in self.running:
+                    pid = self.running.pop(TASK_ID)[1]
+                    # Whatever the task left open is gone with it
+                    for gauge in [self.ssh_sessions, self.ssh_tunnels]:
+                        gauge.pop(pid, None)
+                for gauge in [self.processes, self.worker_cpu, self.worker_memory]:
+                    gauge.pop(TASK_ID, None)
+                self.db_queries.pop(TASK_NAME, None)
+                finished = self.done if event[0] == 'task_done' else self.failed
+                finished[TASK_TYPE] = finished.get(TASK_TYPE, 0) + 1
+            if event[0] in ['ssh_sessions', 'ssh_tunnels']:
+                gauge = self.ssh_sessions if event[0] == 'ssh_sessions' else self.ssh_tunnels
+                gauge[event[1]] = gauge.get(event[1], 0) + event[2]
+            if event[0] == 'db_query_start':
+                self.db_queries[event[1]] = event[2]
+                self.db_rows[event[1]] = 0
+                self.db_rows_per_sec.pop(event[1], None)
+            if event[0] == 'db_rows':
+                self.db_rows[event[1]] = event[2]
+            if event[0] == 'db_query_end':
+                started = self.db_queries.pop(event[1], event[2])
+                seconds = event[2] - started
+                self.db_rows_per_sec[event[1]] = self.db_rows.get(event[1], 0) / seconds if seconds > 0 else 0
+            if event[0] == 'bytes_written':
+                self.bytes_written[event[1]] = event[2]
+
+    def sample(self):
+        '''
+        Measure the CPU and the memory of the running workers. It is called from one thread on a
+        fixed interval, cpu_percent measures the CPU used since its previous call.
+        '''
+        try:
+            import psutil
+        except Exception as ex:
+            return
+        with self.lock:
+            self.collect()
+            for TASK_ID, (TASK_TYPE, pid) in list(self.running.items()):
+                cpu    = 0.0
+                memory = 0
+                # The first cpu_percent of a process has nothing to compare with and is always 0
+                primed = TASK_ID in self.processes
+                try:
+                    if TASK_ID not in self.processes:
+                        self.processes[TASK_ID] = {pid: psutil.Process(pid)}
+                    family = self.processes[TASK_ID]
+                    for child in family[pid].children(recursive=True):
+                        family.setdefault(child.pid, child)
+                    for member_pid, member in list(family.items()):
+                        try:
+                            cpu += member.cpu_percent(interval=None)
+                            try:
+                                # The pages a forked worker still shares with the build process are not its cost
+                                memory += member.memory_full_info().uss
+                            except (psutil.AccessDenied, AttributeError):
+                                memory += member.memory_info().rss
+                        except psutil.Error:
+                            del family[member_pid]
+                except (psutil.Error, KeyError):
+                    # The worker is gone, the worker process reports the task as failed
+                    for gauge in [self.processes, self.worker_cpu, self.worker_memory]:
+                        gauge.pop(TASK_ID, None)
+                    continue
+                self.worker_memory[TASK_ID]  = memory
+                self.type_memory[TASK_TYPE] = max(self.type_memory.get(TASK_TYPE, 0), memory)
+                if not primed:
+                    continue
+                self.worker_cpu[TASK_ID] = cpu
+                if TASK_TYPE in self.type_cpu:
+                    cpu = self.CPU_DECAY * self.type_cpu[TASK_TYPE] + (1 - self.CPU_DECAY) * cpu
+                self.type_cpu[TASK_TYPE] = cpu
+
+    def observed(self):
+        '''
+        Return the running and the pending tasks of each task type, their peak memory and their decayed CPU
+        '''
+        with self.lock:
+            self.collect()
+            return self.running_tasks(), self.pending_tasks(), dict(self.type_memory), dict(self.type_cpu)
+
+    def running_tasks(self):
+        running = {}
+        for TASK_TYPE, pid in self.running.values():
+            running[TASK_TYPE] = running.get(TASK_TYPE, 0) + 1
+        return running
+
+    def pending_tasks(self):
+        running = self.running_tasks()
+        pending = {}
+        for TASK_TYPE, scheduled in self.scheduled.items():
+            pending[TASK_TYPE] = max(scheduled - running.get(TASK_TYPE, 0) - self.done.get(TASK_TYPE, 0) -
+                                     self.failed.get(TASK_TYPE, 0), 0)
+        return pending
+
+    def render(self):
+        '''
+        Return the metrics in the Prometheus text format
+        '''
+        with self.lock:
+            self.collect()
+            lines = []
+
+            def metric(name, kind, help_text, samples):
+                lines.append('# HELP %s %s' % (name, help_text))
+                lines.append('# TYPE %s %s' % (name, kind))
+                for labels, value in samples:
+                    labels = ','.join('%s="%s"' % (label, value) for label, value in labels)
+                    lines.append('%s{%s} %s' % (name, labels, value) if labels else '%s %s' % (name, value))
+
+            now           = time.time()
+            running_tasks = self.running_tasks()
+            pending_tasks = self.pending_tasks()
+            tasks = []
+            for TASK_TYPE in sorted(set(self.scheduled) | set(running_tasks) | set(self.done) | set(self.failed)):
+                running = running_tasks.get(TASK_TYPE, 0)
+                done    = self.done.get(TASK_TYPE, 0)
+                failed  = self.failed.get(TASK_TYPE, 0)
+                pending = pending_tasks.get(TASK_TYPE, 0)
+                for state, value in [('pending', pending), ('running', running), ('done', done), ('failed', failed)]:
+                    tasks.append(([('type', TASK_TYPE), ('state', state)], value))
+            metric('blueprint_tasks', 'gauge', 'Tasks of the build by type and state.', tasks)
+            metric('blueprint_ssh_sessions', 'gauge', 'Open SSH sessions of REMOTE_TASKs.',
+                   [([], sum(self.ssh_sessions.values()))])
+            metric('blueprint_ssh_tunnels', 'gauge', 'Open SSH tunnels of DB_TASKs.',
+                   [([], sum(self.ssh_tunnels.values()))])
+            # A query that stalls keeps its running seconds growing and its rows per second falling
+            db_rows_per_sec = dict(self.db_rows_per_sec)
+            for task, started in self.db_queries.items():
+                db_rows_per_sec[task] = self.db_rows.get(task, 0) / (now - started) if now > started else 0
+            metric('blueprint_db_rows', 'gauge', 'Rows read so far by the query of a DB_TASK.',
+                   [([('task', task)], value) for task, value in sorted(self.db_rows.items())])
+            metric('blueprint_db_rows_per_second', 'gauge', 'Rows per second read by the query of a DB_TASK.',
+                   [([('task', task)], round(value, 3)) for task, value in sorted(db_rows_per_sec.items())])
+            metric('blueprint_db_query_running_seconds', 'gauge', 'Seconds since the running query of a DB_TASK started.',
+                   [([('task', task)], round(now - started, 3)) for task, started in sorted(self.db_queries.items())])
+            metric('blueprint_bytes_written', 'gauge', 'Size of the RESULTS written by a task.',
+                   [([('task', task)], value) for task, value in sorted(self.bytes_written.items())])
+            metric('blueprint_worker_cpu_percent', 'gauge', 'CPU of a worker process and its children.',
+                   [([('pid', self.running[task][1]), ('type', self.running[task][0])], value)
+                    for task, value in sorted(self.worker_cpu.items()) if task in self.running])
+            metric('blueprint_worker_uss_bytes', 'gauge', 'Memory of a worker process and its children that no other process shares.',
+                   [([('pid', self.running[task][1]), ('type', self.running[task][0])], value)
+                    for task, value in sorted(self.worker_memory.items()) if task in self.running])
+            if self.worker_limits:
+                metric('blueprint_workers_limit', 'gauge', 'Running tasks allowed per task type by WORKERS auto.',
+                       [([('type', TASK_TYPE)], value) for TASK_TYPE, value in sorted(self.worker_limits.items())])
+            metric('blueprint_build_seconds', 'gauge', 'Seconds since the build started.',
+                   [([], round(now - self.started, 3))])
+            return '\n'.join(lines) + '\n'
+
+
+def host_memory():
+    '''
+    Return total and available memory of the host in bytes, None if unknown
+    '''
+    try:
+        import psutil
+        memory = psutil.virtual_memory()
+        return memory.total, memory.available
+    except Exception as ex:
+        pass
+    try:
+        meminfo = {}
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                meminfo[key] = int(value.split()[0]) * 1024
+        return meminfo['MemTotal'], meminfo['MemAvailable']
+    except Exception as ex:
+        return None
+
+
+class AutoWorkers(object):
+    '''
+    WORKERS: auto, every task type is a luigi resource and its limit follows the host resources.
+    The limits start from the CPU count and the available memory, while the build runs they move
+    between 1 and a ceiling so that the observed memory and CPU of each task type fit the host.
+    '''
+    INTERVAL = 2
+    # The task types share the host in this order, whatever order the BUILD lists them in
+    TASK_TYPES = ['LOCAL_TASK', 'REMOTE_TASK', 'DB_TASK', 'TRANSFORM_TASK']
+    # Memory assumed for a DB_TASK or a TRANSFORM_TASK until one has been observed
+    TASK_MEMORY = 1024 * 1048576
+
+    def __init__(self, task_types, limits, memory_pressure, metrics):
+        self.cpus            = os.cpu_count() or 1
+        self.memory_pressure = memory_pressure
+        self.metrics         = metrics
+        self.scheduler       = None
+        self.stopped         = threading.Event()
+        self.controller      = None
+        # The controller samples the workers, on its own interval
+        metrics.sampled_by_controller = True
+        # REMOTE_TASKs mostly wait on the network, DB_TASKs and TRANSFORM_TASKs need more memory
+        start   = {'LOCAL_TASK': self.cpus, 'REMOTE_TASK': self.cpus * 4,
+                   'DB_TASK': max(self.cpus // 2, 1), 'TRANSFORM_TASK': max(self.cpus // 2, 1)}
+        ceiling = {'LOCAL_TASK': self.cpus * 2, 'REMOTE_TASK': self.cpus * 8,
+                   'DB_TASK': self.cpus, 'TRANSFORM_TASK': self.cpus}
+        memory = host_memory()
+        if memory is not None:
+            sys.stdout.write('INFO - BUILD, WORKERS auto: %s CPUs, %s MB of %s MB memory available.\n' %
+                             (self.cpus, memory[1] // 1048576, memory[0] // 1048576))
+            headroom = memory[1] - memory[0] * (100 - self.memory_pressure) / 100.0
+            for TASK_TYPE in ['DB_TASK', 'TRANSFORM_TASK']:
+                start[TASK_TYPE] = max(min(start[TASK_TYPE], int(headroom // self.TASK_MEMORY)), 1)
+        self.ceiling = {}
+        self.limits  = {}
+        for TASK_TYPE in [TASK_TYPE for TASK_TYPE in self.TASK_TYPES if TASK_TYPE in task_types]:
+            self.ceiling[TASK_TYPE] = limits.get(TASK_TYPE, ceiling[TASK_TYPE])
+            self.limits[TASK_TYPE]  = min(start[TASK_TYPE], self.ceiling[TASK_TYPE])
+        self.start = dict(self.limits)
+
+    def workers(self):
+        '''
+        Number of luigi workers, enough to run every task type at its ceiling
+        '''
+        return sum(self.ceiling.values())
+
+    def attach(self, scheduler):
+        '''
+        Set the limits of the local scheduler and start adjusting them
+        '''
+        self.scheduler = scheduler
+        for TASK_TYPE, limit in self.limits.items():
+            scheduler.update_resource(TASK_TYPE, limit)
+            sys.stdout.write('INFO - BUILD, WORKERS auto: "%s" limited to %s running tasks.\n' % (TASK_TYPE, limit))
+        self.metrics.worker_limits = dict(self.limits)
+        self.controller = threading.Thread(target=self.control, daemon=True)
+        self.controller.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.controller is not None:
+            self.controller.join()
+
+    def control(self):
+        try:
+            import psutil
+            psutil.cpu_percent(interval=None)
+        except Exception as ex:
+            psutil = None
+
+        while not self.stopped.wait(self.INTERVAL):
+            self.metrics.sample()
+            running, pending, type_memory, type_cpu = self.metrics.observed()
+            memory   = host_memory()
+            cpu_idle = None
+            if psutil is not None:
+                cpu_idle = (100.0 - psutil.cpu_percent(interval=None)) * self.cpus
+            pressure = memory is not None and 100.0 * (memory[0] - memory[1]) / memory[0] >= self.memory_pressure
+            headroom = None
+            if memory is not None:
+                headroom = memory[1] - memory[0] * (100 - self.memory_pressure) / 100.0
+
+            for TASK_TYPE, ceiling in self.ceiling.items():
+                RUNNING = running.get(TASK_TYPE, 0)
+                PENDING = pending.get(TASK_TYPE, 0)
+                if pressure:
+                    limit = 1
+                elif not PENDING:
+                    # Nothing left to start, leave the memory and CPU to the other task types
+                    limit = self.limits[TASK_TYPE]
+                elif not type_memory.get(TASK_TYPE) or TASK_TYPE not in type_cpu:
+                    # Nothing observed yet, keep the starting limit
+                    limit = self.start[TASK_TYPE]
+                else:
+                    # Grow up to the ceiling as long as one more task fits the memory and CPU left
+                    limit = ceiling
+                    if headroom is not None:
+                        limit = min(limit, RUNNING + max(int(headroom // type_memory[TASK_TYPE]), 0))
+                    # Ignore task types that do not use the CPU, like REMOTE_TASKs waiting on SSH
+                    if cpu_idle is not None and type_cpu.get(TASK_TYPE, 0) >= 5:
+                        limit = min(limit, RUNNING + max(int(cpu_idle // type_cpu[TASK_TYPE]), 0))
+                # A limit below the running tasks only stops new ones from starting.
+                # It never goes under 1, luigi stops a worker that has nothing to run.
+                limit = max(limit, 1)
+                # The next task types share what is left after the tasks this one can still start
+                STARTING = min(max(limit - RUNNING, 0), PENDING)
+                if headroom is not None and type_memory.get(TASK_TYPE):
+                    headroom = headroom - STARTING * type_memory[TASK_TYPE]
+                if cpu_idle is not None and type_cpu.get(TASK_TYPE, 0) >= 5:
+                    cpu_idle = cpu_idle - STARTING * type_cpu[TASK_TYPE]
+
+                if limit != self.limits[TASK_TYPE]:
+                    self.scheduler.update_resource(TASK_TYPE, limit)
+                    sys.stdout.write('INFO - BUILD, WORKERS auto: "%s" limited to %s running tasks%s.\n' %
+                                     (TASK_TYPE, limit, ', memory pressure' if pressure else ''))
+                    self.limits[TASK_TYPE] = limit
+            self.metrics.worker_limits = dict(self.limits)
+
+
+class AutoWorkersSchedulerFactory(luigi.interface._WorkerSchedulerFactory):
+    '''
+    Hand the local scheduler to AutoWorkers, the limits of the task types are set on it
+    '''
+
+    def __init__(self, auto_workers):
+        self.auto_workers = auto_workers
+
+    def create_local_scheduler(self):
+        scheduler = super().create_local_scheduler()
+        self.auto_workers.attach(scheduler)
+        return scheduler
+
+
+def push_metric(event, *args):
+    '''
+    Push an event to the build metrics, does nothing if BUILD has no METRICS_FILE or METRICS_PORT
+    '''
+    if build_metrics is not None:
+        build_metrics.events.put((event,) + args)
+
+
+def task_type(task):
+    return blueprint_configuration.get(task.__class__.__name__+"()", "TYPE")
+
+
+@luigi.Task.event_handler(luigi.Event.START)
+def metrics_task_start(task):
+    push_metric('task_start', task.task_id, task_type(task), os.getpid())
+
+
+@luigi.Task.event_handler(luigi.Event.SUCCESS)
+def metrics_task_done(task):
+    RESULTS = task.output().path
+    if os.path.isfile(RESULTS):
+        push_metric('bytes_written', task.__class__.__name__, os.path.getsize(RESULTS))
+    push_metric('task_done', task.task_id, task_type(task), task.__class__.__name__)
+
+
+@luigi.Task.event_handler(luigi.Event.FAILURE)
+def metrics_task_failed(task, exception):
+    push_metric('task_failed', task.task_id, task_type(task), task.__class__.__name__)
+
+
+# A task process that was killed or timed out cannot report, the worker does it for it
+@luigi.Task.event_handler(luigi.Event.PROCESS_FAILURE)
+@luigi.Task.event_handler(luigi.Event.TIMEOUT)
+def metrics_task_died(task, error_msg):
+    push_metric('task_failed', task.task_id, task_type(task), task.__class__.__name__)
+
+
 class LOCAL_TASK(luigi.Task):
 
     def requires(self):
@@ -263,6 +830,7 @@ class REMOTE_TASK(luigi.Task):
                                  (self.__class__.__name__, TASK_OPTIONS['HOST']))
                 server = SSHSession(TASK_OPTIONS['HOST'], TASK_OPTIONS['USER'],
                                     password=TASK_OPTIONS['PASS'], timeout=TASK_OPTIONS['TIMEOUT'],private_key_file=TASK_OPTIONS['KEY']).open()
+                push_metric('ssh_sessions', os.getpid(), 1)
             except Exception as ex:
                 sys.stderr.write('ERROR - Task: %s - Could not connect to host: %s on port: %s with creds: %s' %
                                  (self.__class__.__name__, TASK_OPTIONS['HOST'], TASK_OPTIONS['PORT'], CREDS_NAME))
@@ -279,8 +847,10 @@ class REMOTE_TASK(luigi.Task):
                              (self.__class__.__name__, PROXY))
             proxy_server = SSHSession(
                 PROXY_SERVER, PROXY_USER, password=PROXY_PASS, timeout=TASK_OPTIONS['TIMEOUT'],private_key_file=PROXY_KEY).open()
+            push_metric('ssh_sessions', os.getpid(), 1)
             server = proxy_server.get_remote_session(
                 TASK_OPTIONS['HOST'], password=TASK_OPTIONS['PASS'], compress=False, timeout=TASK_OPTIONS['TIMEOUT'],private_key_file=TASK_OPTIONS['KEY'])
+            push_metric('ssh_sessions', os.getpid(), 1)
             sys.stdout.write('INFO - Task: "%s" - SSH Connect to host: "%s".\n' %
                              (self.__class__.__name__, TASK_OPTIONS['HOST']))
 
@@ -336,6 +906,8 @@ class DB_TASK(luigi.Task):
         db_options['db_name']     = blueprint_configuration.get(DB,'DBNAME')
         db_options['db_port']     = blueprint_configuration.get(DB,'DBPORT')
         db_options['task_name']   = TASK_NAME
+        db_options['results']     = blueprint_configuration.get(self.__class__.__name__+"()","RESULTS")
+        db_options['results_type']= blueprint_configuration.get(self.__class__.__name__+"()","RESULTS_TYPE")
 
         if PROXY != None and USE_PROXY == 'True':
             try:
@@ -348,16 +920,130 @@ class DB_TASK(luigi.Task):
                 pass
         
         sys.stdout.write('INFO - Task: %s - host: %s Preparing to execute  %s\n' % (self.__class__.__name__, db_options['db_hostname'], blueprint_configuration.get(self.__class__.__name__+"()","QUERY")))
-        results = execQuery(db_options    = db_options,    \
-                            db_query      = QUERY,         \
-                            proxy_options = proxy_options, \
-                            use_proxy     = USE_PROXY)
+        # The results are written by execQuery chunk by chunk while the rows arrive
+        rows = execQuery(db_options    = db_options,    \
+                         db_query      = QUERY,         \
+                         proxy_options = proxy_options, \
+                         use_proxy     = USE_PROXY)
+        sys.stdout.write('INFO - Task: %s - Succedeed with %s rows\n' % (self.__class__.__name__, rows))
+
 
-        if blueprint_configuration.get(self.__class__.__name__+"()",'RESULTS_TYPE') == "csv":
-            results.to_csv(blueprint_configuration.get(self.__class__.__name__+"()","RESULTS"),encoding = 'utf-8',index=False,header=True,quoting=2)
+def register_input(connection, task_name, table, path, results_type):
+    '''
+    Make the RESULTS file of a required task visible to the query as a table
+    '''
+    import pyarrow as pa
+    import pyarrow.ipc
+
+    try:
+        # duckdb reads parquet and csv itself, only the columns and rows the query needs
+        if results_type == "parquet":
+            connection.execute("CREATE VIEW \"%s\" AS SELECT * FROM read_parquet('%s')" % (table, path.replace("'", "''")))
+        if results_type == "csv":
+            connection.execute("CREATE VIEW \"%s\" AS SELECT * FROM read_csv_auto('%s')" % (table, path.replace("'", "''")))
+        # An uncompressed Arrow IPC file is scanned in place through the memory map
+        if results_type == "arrow":
+            connection.register(table, pyarrow.ipc.open_file(pa.memory_map(path, 'r')).read_all())
+    except Exception as ex:
+        sys.stderr.write('ERROR - Task "%s" Could not read input: "%s" - %s.\n' % (task_name, path, str(ex)))
+        sys.exit()
 
-        if blueprint_configuration.get(self.__class__.__name__+"()",'RESULTS_TYPE') == "xlsx":
-            results.to_excel(blueprint_configuration.get(self.__class__.__name__+"()","RESULTS"),index=False,header=True)
+
+def write_columnar(batches, path, results_type):
+    '''
+    Write the record batches of a query as the RESULTS file of a task, one batch at a time
+    '''
+    import pyarrow as pa
+    import pyarrow.csv
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    def write(writer):
+        rows = 0
+        with writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                rows = rows + batch.num_rows
+        return rows
+
+    if results_type == "parquet":
+        return write(pyarrow.parquet.ParquetWriter(path, batches.schema))
+    # The arrow and csv writers do not close the file they write to
+    if results_type == "arrow":
+        with pa.OSFile(path, 'wb') as sink:
+            return write(pyarrow.ipc.new_file(sink, batches.schema))
+    if results_type == "csv":
+        with pa.OSFile(path, 'wb') as sink:
+            return write(pyarrow.csv.CSVWriter(sink, batches.schema))
+
+
+def required_sections(blueprint_configuration, section):
+    '''
+    Return the sections named in the REQUIRES parameter of a section
+    '''
+    REQUIRED_TASKS = blueprint_configuration[section]["REQUIRES"]
+    REQUIRED_TASKS = REQUIRED_TASKS.replace('[', '')
+    REQUIRED_TASKS = REQUIRED_TASKS.replace(']', '')
+    return [REQUIRED_TASK.strip() for REQUIRED_TASK in REQUIRED_TASKS.split(",") if REQUIRED_TASK.strip() != '']
+
+
+class TRANSFORM_TASK(luigi.Task):
+
+    def requires(self):
+        return eval(blueprint_configuration.get(self.__class__.__name__+"()", "REQUIRES"))
+
+    def output(self):
+        return luigi.LocalTarget(blueprint_configuration.get(self.__class__.__name__+"()", "RESULTS"))
+
+    def run(self):
+        TASK_NAME = self.__class__.__name__+"()"
+        try:
+            import duckdb
+            import pyarrow
+        except Exception as ex:
+            sys.stderr.write('ERROR - Task "%s" Needs duckdb and pyarrow to run: %s.\n' % (TASK_NAME, str(ex)))
+            sys.exit()
+
+        with open(blueprint_configuration.get(TASK_NAME, "QUERY"), "r") as f:
+            QUERY = f.read()
+        RESULTS      = blueprint_configuration.get(TASK_NAME, "RESULTS")
+        RESULTS_TYPE = blueprint_configuration.get(TASK_NAME, "RESULTS_TYPE")
+
+        # Every required task is visible to the query as a table named after it
+        connection = duckdb.connect(database=':memory:')
+        for required_task in luigi.task.flatten(self.requires()):
+            TABLE = required_task.__class__.__name__
+            INPUT = required_task.output().path
+            sys.stdout.write('INFO - Task: %s - Mapping: "%s" as table: "%s".\n' %
+                             (self.__class__.__name__, INPUT, TABLE))
+            register_input(connection   = connection,
+                           task_name    = TASK_NAME,
+                           table        = TABLE,
+                           path         = INPUT,
+                           results_type = blueprint_configuration.get(TABLE+"()", "RESULTS_TYPE"))
+
+        sys.stdout.write('INFO - Task: %s - Preparing to execute  %s\n' %
+                         (self.__class__.__name__, blueprint_configuration.get(TASK_NAME, "QUERY")))
+        try:
+            # The result is never held whole, duckdb hands it over in batches
+            results = connection.execute(QUERY)
+            # to_arrow_reader() replaces fetch_record_batch() from duckdb 1.4 on
+            if hasattr(results, 'to_arrow_reader'):
+                batches = results.to_arrow_reader()
+            else:
+                batches = results.fetch_record_batch()
+            rows    = write_columnar(batches=batches, path=RESULTS, results_type=RESULTS_TYPE)
+        except Exception as ex:
+            # A partial RESULTS file would mark the task as complete on the next run
+            if os.path.isfile(RESULTS):
+                os.remove(RESULTS)
+            sys.stderr.write('ERROR - Could not execute task: "%s" - %s.\n' % (TASK_NAME, str(ex)))
+            sys.exit()
+        finally:
+            connection.close()
+
+        sys.stdout.write('INFO - Task: %s - Succedeed with %s rows check %s.\n' %
+                         (self.__class__.__name__, rows, RESULTS))
 
 
 def cleanup_tasks(blueprint_configuration):
@@ -380,6 +1066,8 @@ def blueprint_sanity_checks(blueprint_configuration):
         blueprint_configuration=blueprint_configuration)
     blueprint_configuration = sanity_checks_db(
         blueprint_configuration=blueprint_configuration)
+    blueprint_configuration = sanity_checks_transform(
+        blueprint_configuration=blueprint_configuration)
     return blueprint_configuration
 
 
@@ -452,6 +1140,12 @@ def sanity_checks_db(blueprint_configuration):
             # IF TASK RESULTS OPTION IS MISSING DIE
             section_mgr(blueprint_configuration=blueprint_configuration, section=section, section_param="RESULTS",
                         verify="section_does_not_exist,section_option_does_not_exist", action="die,die")
+            # IF TASK RESULTS_TYPE OPTION IS MISSING CREATE csv
+            blueprint_configuration = section_mgr(blueprint_configuration=blueprint_configuration, section=section, section_param="RESULTS_TYPE",
+                                                  verify="section_does_not_exist,section_option_does_not_exist", action="create,create:csv")
+            # IF TASK RESULTS_TYPE OPTION is not csv, xlsx, parquet or arrow die
+            section_mgr(blueprint_configuration=blueprint_configuration, section=section,
+                        section_param="RESULTS_TYPE", verify="section_option_allowed_values:csv-xlsx-parquet-arrow", action="die")
             # IF TASK REQUIRES OPTION IS MISSING CREATE EMPTY
             blueprint_configuration = section_mgr(blueprint_configuration=blueprint_configuration, section=section,
                                                   section_param="REQUIRES", verify="section_does_not_exist,section_option_does_not_exist", action="create,create:[]")
@@ -468,6 +1162,68 @@ def sanity_checks_db(blueprint_configuration):
 
     return blueprint_configuration
 
+def sanity_checks_transform(blueprint_configuration):
+    '''
+    Do some sanity checks to blueprint configuration for transform tasks, set some defaults if needed.
+    '''
+    for section in blueprint_configuration:
+
+        # DONT CARE FOR THOSE SECTIONS
+        if section not in ['BUILD', 'DEFAULT']:
+
+            # IF TASK DOES NOT HAVE A "TYPE" PARAMETER DIE
+            section_mgr(blueprint_configuration=blueprint_configuration, section=section,
+                        section_param="TYPE", verify="section_does_not_exist", action="die")
+            # IF TASK TYPE != "TRANSFORM_TASK" THERE IS NOTHING ELSE TO CHECK, RETURN
+            if blueprint_configuration[section]["TYPE"] != "TRANSFORM_TASK":
+                continue
+            # IF TASK DOES NOT HAVE A "QUERY" PARAMETER DIE
+            section_mgr(blueprint_configuration=blueprint_configuration, section=section, section_param="QUERY",
+                        verify="section_does_not_exist,section_option_does_not_exist", action="die,die")
+            # IF TASK RESULTS OPTION IS MISSING DIE
+            section_mgr(blueprint_configuration=blueprint_configuration, section=section, section_param="RESULTS",
+                        verify="section_does_not_exist,section_option_does_not_exist", action="die,die")
+            # IF TASK RESULTS_TYPE OPTION IS MISSING CREATE parquet
+            blueprint_configuration = section_mgr(blueprint_configuration=blueprint_configuration, section=section, section_param="RESULTS_TYPE",
+                                                  verify="section_does_not_exist,section_option_does_not_exist", action="create,create:parquet")
+            # IF TASK RESULTS_TYPE OPTION is not parquet, arrow or csv die
+            section_mgr(blueprint_configuration=blueprint_configuration, section=section,
+                        section_param="RESULTS_TYPE", verify="section_option_allowed_values:parquet-arrow-csv", action="die")
+            # IF TASK REQUIRES OPTION IS MISSING CREATE EMPTY
+            blueprint_configuration = section_mgr(blueprint_configuration=blueprint_configuration, section=section,
+                                                  section_param="REQUIRES", verify="section_does_not_exist,section_option_does_not_exist", action="create,create:[]")
+            # IF TASK CLEANUP OPTION IS MISSING CREATE False
+            blueprint_configuration = section_mgr(blueprint_configuration=blueprint_configuration, section=section, section_param="CLEANUP",
+                                                  verify="section_does_not_exist,section_option_does_not_exist", action="create,create:False")
+            # IF TASK CLEANUP OPTION is not True or False die
+            section_mgr(blueprint_configuration=blueprint_configuration, section=section,
+                        section_param="CLEANUP", verify="section_option_allowed_values:True-False", action="die")
+
+    # Every transform task has its defaults now, check what the transform tasks read
+    for section in blueprint_configuration:
+        if section in ['BUILD', 'DEFAULT'] or blueprint_configuration[section]["TYPE"] != "TRANSFORM_TASK":
+            continue
+        for REQUIRED_TASK in required_sections(blueprint_configuration=blueprint_configuration, section=section):
+            # IF A REQUIRED TASK DOES NOT EXIST DIE
+            if REQUIRED_TASK not in blueprint_configuration:
+                sys.stderr.write(
+                    'ERROR - Task "%s" in "REQUIRES" of Task: "%s" do not exist in blueprint file\n' % (REQUIRED_TASK, section))
+                sys.exit(-1)
+            # IF A REQUIRED TASK DOES NOT WRITE parquet, arrow or csv DIE
+            # LOCAL_TASK and REMOTE_TASK write the output of their command, they can only declare it as csv
+            REQUIRED_TYPE = blueprint_configuration[REQUIRED_TASK]["TYPE"]
+            RESULTS_TYPE  = blueprint_configuration[REQUIRED_TASK].get("RESULTS_TYPE", "")
+            if REQUIRED_TYPE in ["LOCAL_TASK", "REMOTE_TASK"]:
+                ALLOWED = ["csv"]
+            else:
+                ALLOWED = ["parquet", "arrow", "csv"]
+            if REQUIRED_TYPE not in ["LOCAL_TASK", "REMOTE_TASK", "DB_TASK", "TRANSFORM_TASK"] or RESULTS_TYPE not in ALLOWED:
+                sys.stderr.write(
+                    'ERROR - Task "%s" in "REQUIRES" of Task: "%s" must have a "RESULTS_TYPE" of %s\n' % (REQUIRED_TASK, section, ALLOWED))
+                sys.exit(-1)
+
+    return blueprint_configuration
+
 def sanity_checks_remote(blueprint_configuration):
     '''
     Do some sanity checks to blueprint configuration for remote tasks, set some defaults if needed.
@@ -604,16 +1360,44 @@ def sanity_checks_build(blueprint_configuration):
             sys.exit(-1)
 
     # Get workers option or set a default one
-    # Die if given value is not a single number or if value is a string
+    # Die if given value is not a single number or "auto"
     if "WORKERS" not in blueprint_configuration["BUILD"]:
         sys.stdout.write('WARN - BUILD, WORKERS missing, defaulting to "8"\n')
         blueprint_configuration["BUILD"]["WORKERS"] = "8"
+    elif blueprint_configuration["BUILD"]["WORKERS"].lower() == "auto":
+        blueprint_configuration["BUILD"]["WORKERS"] = "auto"
     else:
         try:
             int(blueprint_configuration["BUILD"]["WORKERS"])
         except Exception as ex:
             sys.stderr.write(
-                'ERROR - BUILD, WORKERS is not an integer or a single number.\n')
+                'ERROR - BUILD, WORKERS is not an integer, a single number or "auto".\n')
+            sys.exit(-1)
+
+    # Die if a task type limit is not a positive integer, warn if it is not used
+    for TASK_TYPE in ["LOCAL_TASK", "REMOTE_TASK", "DB_TASK", "TRANSFORM_TASK"]:
+        if "LIMIT_"+TASK_TYPE not in blueprint_configuration["BUILD"]:
+            continue
+        try:
+            if int(blueprint_configuration["BUILD"]["LIMIT_"+TASK_TYPE]) < 1:
+                raise ValueError(blueprint_configuration["BUILD"]["LIMIT_"+TASK_TYPE])
+        except Exception as ex:
+            sys.stderr.write(
+                'ERROR - BUILD, LIMIT_%s is not a positive integer.\n' % (TASK_TYPE))
+            sys.exit(-1)
+        if blueprint_configuration["BUILD"]["WORKERS"] != "auto":
+            sys.stdout.write('WARN - BUILD, LIMIT_%s is only used when WORKERS is "auto".\n' % (TASK_TYPE))
+
+    # Get memory pressure option or set a default one, only used when WORKERS is "auto"
+    if "MEMORY_PRESSURE" not in blueprint_configuration["BUILD"]:
+        blueprint_configuration["BUILD"]["MEMORY_PRESSURE"] = "85"
+    else:
+        try:
+            if int(blueprint_configuration["BUILD"]["MEMORY_PRESSURE"]) not in range(1, 100):
+                raise ValueError(blueprint_configuration["BUILD"]["MEMORY_PRESSURE"])
+        except Exception as ex:
+            sys.stderr.write(
+                'ERROR - BUILD, MEMORY_PRESSURE is not a percentage between 1 and 99.\n')
             sys.exit(-1)
 
     if "LOCAL_SCHEDULER" not in blueprint_configuration["BUILD"]:
@@ -624,9 +1408,32 @@ def sanity_checks_build(blueprint_configuration):
                 'ERROR - BUILD, LOCAL_SCHEDULER must be either "True" or "False".\n')
             sys.exit(-1)
 
+    # Die if METRICS_PORT is not a port
+    if "METRICS_PORT" in blueprint_configuration["BUILD"]:
+        try:
+            if int(blueprint_configuration["BUILD"]["METRICS_PORT"]) not in range(1, 65536):
+                raise ValueError(blueprint_configuration["BUILD"]["METRICS_PORT"])
+        except Exception as ex:
+            sys.stderr.write(
+                'ERROR - BUILD, METRICS_PORT is not a port number.\n')
+            sys.exit(-1)
+
+    # Get metrics interval or set a default one, only used if METRICS_FILE or METRICS_PORT is set
+    if "METRICS_INTERVAL" not in blueprint_configuration["BUILD"]:
+        blueprint_configuration["BUILD"]["METRICS_INTERVAL"] = "5"
+    else:
+        try:
+            if int(blueprint_configuration["BUILD"]["METRICS_INTERVAL"]) < 1:
+                raise ValueError(blueprint_configuration["BUILD"]["METRICS_INTERVAL"])
+        except Exception as ex:
+            sys.stderr.write(
+                'ERROR - BUILD, METRICS_INTERVAL is not a positive integer.\n')
+            sys.exit(-1)
+
     # Die if there is a non known parameter for BUILD section
     for parameter in blueprint_configuration["BUILD"]:
-        if parameter not in ['local_scheduler', 'workers', 'tasks']:
+        if parameter not in ['local_scheduler', 'workers', 'tasks', 'metrics_file', 'metrics_port', 'metrics_interval',
+                             'limit_local_task', 'limit_remote_task', 'limit_db_task', 'limit_transform_task', 'memory_pressure']:
             sys.stderr.write(
                 'ERROR - "%s" Is not a valid parameter for BUILD section\n' % (parameter))
             sys.exit(-1)
@@ -663,6 +1470,8 @@ def get_blueprint_configuration(blueprint):
 
 
 # Program Starts Here
+# Set when BUILD has a METRICS_FILE or METRICS_PORT, inherited by the worker processes.
+build_metrics = None
 # Create command line arguments, our only argument is the blueprint file.
 cmd_options = argparse.ArgumentParser(description='Luigi Blueprint')
 cmd_options.add_argument(
@@ -678,12 +1487,16 @@ blueprint_configuration = blueprint_sanity_checks(
 for task in blueprint_configuration:
     if task not in ['BUILD', 'DEFAULT']:
         TASK_TYPE = blueprint_configuration[task]["TYPE"]
-        if TASK_TYPE in ["LOCAL_TASK", "REMOTE_TASK", "DB_TASK"]:
+        if TASK_TYPE in ["LOCAL_TASK", "REMOTE_TASK", "DB_TASK", "TRANSFORM_TASK"]:
             results_test = blueprint_configuration[task]["RESULTS"]
             cleanup_test = blueprint_configuration[task]["CLEANUP"]
             try:
                 task = task.replace('()', '')
-                exec("class %s(%s):\n\tpass\n" % (task, TASK_TYPE))
+                if blueprint_configuration["BUILD"]["WORKERS"] == "auto":
+                    # Every task type is a luigi resource, AutoWorkers sets its limit
+                    exec("class %s(%s):\n\tresources = {'%s': 1}\n" % (task, TASK_TYPE, TASK_TYPE))
+                else:
+                    exec("class %s(%s):\n\tpass\n" % (task, TASK_TYPE))
 
                 if os.path.isfile(results_test) == True and cleanup_test == "True":
                     os.remove(results_test)
@@ -707,6 +1520,35 @@ for task in blueprint_configuration:
 
 if __name__ == '__main__':
     TASKS = eval(blueprint_configuration.get("BUILD", "TASKS"))
-    luigi.build(TASKS, local_scheduler=True, workers=int(
-        blueprint_configuration.get("BUILD", "workers")), log_level='NOTSET')
+    WORKERS = blueprint_configuration.get("BUILD", "WORKERS")
+    # WORKERS auto sizes the task types from the RSS and CPU observed by the metrics
+    if "METRICS_FILE" in blueprint_configuration["BUILD"] or "METRICS_PORT" in blueprint_configuration["BUILD"] or WORKERS == "auto":
+        METRICS_FILE = blueprint_configuration["BUILD"].get("METRICS_FILE")
+        METRICS_PORT = blueprint_configuration["BUILD"].get("METRICS_PORT")
+        build_metrics = BuildMetrics(metrics_file     = METRICS_FILE,
+                                     metrics_port     = int(METRICS_PORT) if METRICS_PORT else None,
+                                     metrics_interval = int(blueprint_configuration.get("BUILD", "METRICS_INTERVAL")))
+        build_metrics.start(tasks=TASKS)
+    if WORKERS == "auto":
+        TASK_TYPES = []
+        LIMITS     = {}
+        for task in blueprint_configuration:
+            if task not in ['BUILD', 'DEFAULT']:
+                TASK_TYPES.append(blueprint_configuration[task]["TYPE"])
+        TASK_TYPES = [TASK_TYPE for TASK_TYPE in AutoWorkers.TASK_TYPES if TASK_TYPE in TASK_TYPES]
+        for TASK_TYPE in TASK_TYPES:
+            if "LIMIT_"+TASK_TYPE in blueprint_configuration["BUILD"]:
+                LIMITS[TASK_TYPE] = int(blueprint_configuration["BUILD"]["LIMIT_"+TASK_TYPE])
+        auto_workers = AutoWorkers(task_types      = TASK_TYPES,
+                                   limits          = LIMITS,
+                                   memory_pressure = int(blueprint_configuration.get("BUILD", "MEMORY_PRESSURE")),
+                                   metrics         = build_metrics)
+        luigi.build(TASKS, local_scheduler=True, workers=auto_workers.workers(),
+                    worker_scheduler_factory=AutoWorkersSchedulerFactory(auto_workers), log_level='NOTSET')
+        auto_workers.stop()
+    else:
+        luigi.build(TASKS, local_scheduler=True, workers=int(
+            blueprint_configuration.get("BUILD", "workers")), log_level='NOTSET')
+    if build_metrics is not None:
+        build_metrics.stop()
     sys.stdout.write('INFO - END.\n')